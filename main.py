@@ -1,6 +1,5 @@
-def main():
-    print("Hello from ai-design-patterns!")
+from ai_design_patterns.serving.server import main
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,7 +3,12 @@ from pydantic import BaseModel, Field
 
 class ProcessedText(BaseModel):
     summary: str = Field(..., description="A concise summary of the text.")
-    semantic_tags: list[str] = Field(..., description="A list of semantic tags extracted from the text.")
-    named_entities: list[str] = Field(..., description="A list of named entities identified in the text.")
+    # The analysis prompts ask for comma-separated tags and entities, so repair may split strings on commas
+    semantic_tags: list[str] = Field(
+        ..., description="A list of semantic tags extracted from the text.", json_schema_extra={"comma_separated": True}
+    )
+    named_entities: list[str] = Field(
+        ..., description="A list of named entities identified in the text.", json_schema_extra={"comma_separated": True}
+    )
     original_content: str = Field(..., description="The original text content that was processed.")
     sentiment: str = Field(..., description="The sentiment of the text (e.g., positive, negative, neutral).")
\ No newline at end of file
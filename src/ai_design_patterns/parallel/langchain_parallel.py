@@ -1,26 +1,40 @@
 import os
 import asyncio
 
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Tuple
 from dotenv import load_dotenv; load_dotenv()
 
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import Runnable, RunnableLambda, RunnableParallel, RunnablePassthrough
-from langchain_community.document_loaders import PyPDFLoader
 
 from ai_design_patterns.data_models.extract_model import ProcessedText
+from ai_design_patterns.parallel.pdf_extraction import ExtractedPdf, PdfExtractionError, pdf_extractor
+from ai_design_patterns.runtime.hedging import hedge_config, hedged
+from ai_design_patterns.runtime.single_flight import coalesced
+from ai_design_patterns.runtime.structured_output import repairing_structured_output
+from ai_design_patterns.runtime.streaming import StreamTiming, timed_stream
 
 MODEL = "x-ai/grok-4.1-fast"
 
-# Initialize the ChatOpenAI model (via OpenRouter) with API key and base URL from environment variables
+# Initialize the ChatOpenAI model (via OpenRouter) with API key and base URL from environment variables.
+# Chains wrap it in `coalesced`, so concurrent runs over the same PDF share each upstream call.
 llm = ChatOpenAI(
     model=MODEL,
     api_key=os.environ["OPENAI_KEY"],
     base_url=os.environ["OPENAI_BASE_URL"]
 )
 
+# Backup model for hedged calls: takes over calls that are slower than the primary's recent latency percentile
+llm_backup = ChatOpenAI(
+    model=hedge_config("parallel").backup_model,
+    api_key=os.environ["OPENAI_KEY"],
+    base_url=os.environ["OPENAI_BASE_URL"]
+)
+
+hedged_llm = hedged(llm, llm_backup, role="parallel")
+
 
 def load_pdf(target_file: Dict[str, Any]) -> str:
     """
@@ -30,103 +44,141 @@ def load_pdf(target_file: Dict[str, Any]) -> str:
         target_file: Dictionary containing 'file_path' key with the path to the PDF.
 
     Returns:
-        The text content of the first page of the PDF, or empty string if loading fails.
-    """
-    doc = None
-    if "file_path" in target_file:
-        file_path = target_file["file_path"]
-        try:
-            loader = PyPDFLoader(file_path)
-            doc = loader.load()
-        except Exception:
-            pass  # Silently fail and return empty string
+        The text content of the first page of the PDF.
 
-    return doc[0].page_content if doc else ""
+    Raises:
+        PdfExtractionError: If 'file_path' is missing or the PDF cannot be read or parsed.
+    """
+    return _first_page(target_file, pdf_extractor.extract(_target_path(target_file)))
 
 
-async def main(file_path: str) -> ProcessedText:
+async def aload_pdf(target_file: Dict[str, Any]) -> str:
     """
-    Process a PDF file using parallel LangChain runnables.
-
-    1. Loads PDF content.
-    2. Runs four parallel chains: summary, semantic tags, sentiment, named entities.
-    3. Synthesizes results into a ProcessedText object using structured output.
+    Async variant of `load_pdf`; parsing runs on the extractor's process pool instead of the event loop.
 
     Args:
-        file_path: Path to the PDF file.
+        target_file: Dictionary containing 'file_path' key with the path to the PDF.
 
     Returns:
-        ProcessedText object with extracted and synthesized information.
+        The text content of the first page of the PDF.
+
+    Raises:
+        PdfExtractionError: If 'file_path' is missing or the PDF cannot be read or parsed.
     """
-    # Runnable to load PDF content
-    pdf_loader = RunnableLambda(load_pdf)
-
-    # Summary chain: concise paragraph summary
-    summarize_chain: Runnable = (
-        ChatPromptTemplate.from_messages([
-            ("system", "Summarize the given text into a concise paragraph."),
-            ("user", "{content}")
-        ])
-        | llm
-        | StrOutputParser()
-    )
+    return _first_page(target_file, await pdf_extractor.aextract(_target_path(target_file)))
 
-    # Semantic tags chain: extract 5 tags
-    semantic_chain: Runnable = (
-        ChatPromptTemplate.from_messages([
-            ("system", "Extract 5 semantic tags from the given text, separated by commas."),
-            ("user", "{content}")
-        ])
-        | llm
-        | StrOutputParser()
-    )
 
-    # Sentiment chain: score from -1 to 1
-    sentiment_chain: Runnable = (
-        ChatPromptTemplate.from_messages([
-            ("system", "Evaluate the sentiment of the given text and return a score from -1.0 (very negative) to 1.0 (very positive)."),
-            ("user", "{content}")
-        ])
-        | llm
-        | StrOutputParser()
-    )
+def _target_path(target_file: Dict[str, Any]) -> str:
+    if "file_path" not in target_file:
+        raise PdfExtractionError(str(target_file), "input", "missing 'file_path' key")
+    return target_file["file_path"]
 
-    # Named entities chain: org/location/person
-    named_entities_chain: Runnable = (
-        ChatPromptTemplate.from_messages([
-            ("system", "Extract named entities (organization, location, person) from the given text. List them separated by commas."),
-            ("user", "{content}")
-        ])
-        | llm
-        | StrOutputParser()
-    )
 
-    # Synthesis prompt using parallel outputs
-    synthesis_prompt = ChatPromptTemplate.from_messages([
-        ("system", """Synthesize the following into a JSON object matching the ProcessedText schema:
+def _first_page(target_file: Dict[str, Any], extracted: ExtractedPdf) -> str:
+    if not extracted.pages:
+        raise PdfExtractionError(target_file["file_path"], "parse", "document has no pages")
+    return extracted.pages[0]
+
+
+# Runnable to load PDF content
+pdf_loader = RunnableLambda(load_pdf, afunc=aload_pdf)
+
+# Summary chain: concise paragraph summary
+summarize_chain: Runnable = (
+    ChatPromptTemplate.from_messages([
+        ("system", "Summarize the given text into a concise paragraph."),
+        ("user", "{content}")
+    ])
+    | coalesced(hedged_llm, label="parallel.summary")
+    | StrOutputParser()
+)
+
+# Semantic tags chain: extract 5 tags
+semantic_chain: Runnable = (
+    ChatPromptTemplate.from_messages([
+        ("system", "Extract 5 semantic tags from the given text, separated by commas."),
+        ("user", "{content}")
+    ])
+    | coalesced(hedged_llm, label="parallel.semantic")
+    | StrOutputParser()
+)
+
+# Sentiment chain: score from -1 to 1
+sentiment_chain: Runnable = (
+    ChatPromptTemplate.from_messages([
+        ("system", "Evaluate the sentiment of the given text and return a score from -1.0 (very negative) to 1.0 (very positive)."),
+        ("user", "{content}")
+    ])
+    | coalesced(hedged_llm, label="parallel.sentiment")
+    | StrOutputParser()
+)
+
+# Named entities chain: org/location/person
+named_entities_chain: Runnable = (
+    ChatPromptTemplate.from_messages([
+        ("system", "Extract named entities (organization, location, person) from the given text. List them separated by commas."),
+        ("user", "{content}")
+    ])
+    | coalesced(hedged_llm, label="parallel.named_entities")
+    | StrOutputParser()
+)
+
+# Analysis chains run in parallel, keyed by the synthesis prompt variable they fill
+analysis_chains: Dict[str, Runnable] = {
+    "summary": summarize_chain,
+    "semantic": semantic_chain,
+    "sentiment": sentiment_chain,
+    "named_entities": named_entities_chain,
+}
+
+# Synthesis prompt using parallel outputs
+synthesis_prompt = ChatPromptTemplate.from_messages([
+    ("system", """Synthesize the following into a JSON object matching the ProcessedText schema:
 
 Summary: {summary}
 Semantic Tags: {semantic}
 Sentiment: {sentiment}
 Named Entities: {named_entities}"""),
-        ("user", "Original text: {content}")
-    ])
+    ("user", "Original text: {content}")
+])
+
+# Synthesis chain: parallel outputs -> structured output
+synthesis_chain = synthesis_prompt | coalesced(
+    hedged(
+        repairing_structured_output(llm, ProcessedText),
+        repairing_structured_output(llm_backup, ProcessedText),
+        role="parallel",
+    ),
+    label="parallel.synthesis",
+)
+
+
+async def main(file_path: str) -> ProcessedText:
+    """
+    Process a PDF file using parallel LangChain runnables.
+
+    1. Loads PDF content.
+    2. Runs four parallel chains: summary, semantic tags, sentiment, named entities.
+    3. Synthesizes results into a ProcessedText object using structured output.
 
+    Args:
+        file_path: Path to the PDF file.
+
+    Returns:
+        ProcessedText object with extracted and synthesized information.
+    """
     # Parallel processing chain
     parallel_chain = (
         {"file_path": RunnablePassthrough()}
         | RunnablePassthrough.assign(content=pdf_loader)
         | RunnableParallel({
             "content": lambda x: x["content"],
-            "summary": summarize_chain,
-            "semantic": semantic_chain,
-            "sentiment": sentiment_chain,
-            "named_entities": named_entities_chain,
+            **analysis_chains,
         })
     )
 
     # Full chain: parallel -> synthesis -> structured output
-    full_chain = parallel_chain | synthesis_prompt | llm.with_structured_output(ProcessedText)
+    full_chain = parallel_chain | synthesis_chain
 
     # Uncomment to visualize the chain as Mermaid diagram
     # graph = full_chain.get_graph().draw_mermaid()
@@ -135,7 +187,53 @@ Named Entities: {named_entities}"""),
     return await full_chain.ainvoke(file_path)
 
 
+async def astream(file_path: str) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Process a PDF file like `main`, yielding each analysis field as soon as its chain finishes.
+
+    Args:
+        file_path: Path to the PDF file.
+
+    Yields:
+        (field, value) pairs. The analysis fields ("summary", "semantic", "sentiment",
+        "named_entities") arrive in completion order, followed by ("result", ProcessedText)
+        once synthesis has finished.
+    """
+    content = await pdf_loader.ainvoke({"file_path": file_path})
+
+    async def run_chain(field: str, chain: Runnable) -> Tuple[str, str]:
+        return field, await chain.ainvoke({"content": content})
+
+    tasks = [asyncio.create_task(run_chain(field, chain)) for field, chain in analysis_chains.items()]
+    outputs: Dict[str, Any] = {"content": content}
+    try:
+        for finished in asyncio.as_completed(tasks):
+            field, value = await finished
+            outputs[field] = value
+            yield field, value
+    finally:
+        # Consumer stopped early or a chain failed: don't leave the others running, and wait for the
+        # cancellations so no model call outlives the stream and every task's exception is retrieved
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    yield "result", await synthesis_chain.ainvoke(outputs)
+
+
+async def stream_main(file_path: str) -> None:
+    """
+    Print analysis fields of a PDF file as they stream in, followed by the stream timing.
+
+    Args:
+        file_path: Path to the PDF file.
+    """
+    timing = StreamTiming("parallel")
+    async for field, value in timed_stream(astream(file_path), timing):
+        print(f"{field}: {value}")
+    print(timing)
+
+
 if __name__ == "__main__":
     file_path = "src/ai_design_patterns/parallel/sample.pdf"
-    result = asyncio.run(main(file_path))
-    print(result)
+    asyncio.run(stream_main(file_path))
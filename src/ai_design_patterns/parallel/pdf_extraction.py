@@ -0,0 +1,289 @@
+"""
+PDF text extraction engine for the parallel pattern.
+
+pypdf parsing is CPU-bound, so running it inside a coroutine blocks every other request on
+the event loop. `PdfExtractor` moves the work off the loop:
+
+1. The file is memory-mapped and hashed (SHA-256) on a worker thread.
+2. If the hash is cached (in memory, then on disk), the cached page texts are returned and nothing is parsed.
+3. Otherwise pages are split into ranges and extracted on a process pool; each worker memory-maps the file itself,
+   so PDF bytes are never pickled across processes.
+
+Failures raise `PdfExtractionError` describing the file, stage and page instead of yielding empty text.
+If a parse process dies (out of memory, or a crash on a hostile PDF), the extraction fails at the
+"parse" stage and the pool is replaced for later extractions.
+"""
+
+import os
+import json
+import mmap
+import asyncio
+import hashlib
+import tempfile
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Literal
+
+from pydantic import BaseModel, Field
+from pypdf import PdfReader
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("PDF_CACHE_DIR") or Path.home() / ".cache" / "ai_design_patterns" / "pdf")
+
+Stage = Literal["input", "read", "parse", "page"]
+
+
+class PdfExtractionError(Exception):
+    """
+    Raised when text cannot be extracted from a PDF.
+
+    Attributes:
+        file_path: The PDF that failed.
+        stage: Where extraction failed: "input" (bad arguments), "read" (file I/O),
+            "parse" (document structure) or "page" (a single page's text).
+        detail: Description of the underlying error.
+        page: Zero-based index of the failing page, for the "page" stage.
+    """
+
+    def __init__(self, file_path: str, stage: Stage, detail: str, page: int | None = None):
+        location = f" (page {page})" if page is not None else ""
+        super().__init__(f"Failed to extract {file_path} at {stage} stage{location}: {detail}")
+        self.file_path = file_path
+        self.stage = stage
+        self.detail = detail
+        self.page = page
+
+    def __reduce__(self):
+        # Raised inside pool workers, so it must survive pickling with all of its fields
+        return (type(self), (self.file_path, self.stage, self.detail, self.page))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"file_path": self.file_path, "stage": self.stage, "detail": self.detail, "page": self.page}
+
+
+class ExtractedPdf(BaseModel):
+    file_path: str = Field(..., description="Path of the extracted PDF.")
+    content_hash: str = Field(..., description="SHA-256 of the file content, used as the cache key.")
+    pages: List[str] = Field(..., description="Extracted text of every page, in order.")
+    cached: bool = Field(..., description="Whether the text was served from the cache without parsing.")
+
+
+def _open_reader(file_path: str, mm: mmap.mmap) -> PdfReader:
+    try:
+        return PdfReader(mm)
+    except Exception as exc:
+        raise PdfExtractionError(file_path, "parse", f"{type(exc).__name__}: {exc}") from None
+
+
+def _map_file(file_path: str) -> tuple[Any, mmap.mmap]:
+    try:
+        file = open(file_path, "rb")
+    except OSError as exc:
+        raise PdfExtractionError(file_path, "read", f"{type(exc).__name__}: {exc}") from None
+    try:
+        return file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as exc:
+        file.close()
+        # mmap rejects empty files with ValueError
+        raise PdfExtractionError(file_path, "read", f"{type(exc).__name__}: {exc}") from None
+
+
+def hash_file(file_path: str) -> str:
+    """
+    SHA-256 of a file, read through a memory map.
+
+    Args:
+        file_path: Path of the file.
+
+    Returns:
+        Hex digest of the file content.
+    """
+    file, mm = _map_file(file_path)
+    with file, mm:
+        return hashlib.sha256(mm).hexdigest()
+
+
+def count_pages(file_path: str) -> int:
+    """Number of pages of a PDF. Runs in a pool worker."""
+    file, mm = _map_file(file_path)
+    with file, mm:
+        return len(_open_reader(file_path, mm).pages)
+
+
+def extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of pages [start, stop) of a PDF. Runs in a pool worker.
+
+    Args:
+        file_path: Path of the PDF.
+        start: Index of the first page to extract.
+        stop: Index after the last page to extract.
+
+    Returns:
+        Text of each page in the range.
+    """
+    file, mm = _map_file(file_path)
+    with file, mm:
+        reader = _open_reader(file_path, mm)
+        texts = []
+        for index in range(start, stop):
+            try:
+                texts.append(reader.pages[index].extract_text())
+            except Exception as exc:
+                raise PdfExtractionError(file_path, "page", f"{type(exc).__name__}: {exc}", page=index) from None
+        return texts
+
+
+class PdfExtractor:
+    """
+    Extracts PDF page texts on a process pool, caching results by file content hash.
+
+    Args:
+        max_workers: Size of the process pool (defaults to the number of CPUs). Processes running several
+            extractors, such as the server's workers, should split the CPUs between them.
+        pages_per_task: Number of pages extracted by a single pool task.
+        cache_dir: Directory of the on-disk cache, or None to only cache in memory.
+        memory_cache_size: Number of documents kept in the in-memory cache.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        pages_per_task: int = 16,
+        cache_dir: Path | None = DEFAULT_CACHE_DIR,
+        memory_cache_size: int = 128,
+    ):
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.memory_cache_size = memory_cache_size
+        self._memory: OrderedDict[str, List[str]] = OrderedDict()
+        self._pool: Executor | None = None
+
+    @property
+    def pool(self) -> Executor:
+        if self._pool is None:
+            # Spawn rather than fork: the pool is started from a process already running threads
+            # (the event loop's default executor), and forking those can deadlock the children
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _discard_pool(self, pool: Executor) -> None:
+        # A pool whose process died rejects all further work; the next extraction starts a new one.
+        # Concurrent extractions may discard the same pool, so only the current one is reset
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def aextract(self, file_path: str) -> ExtractedPdf:
+        """
+        Extract all page texts of a PDF without blocking the event loop.
+
+        Args:
+            file_path: Path of the PDF.
+
+        Returns:
+            The extracted pages.
+
+        Raises:
+            PdfExtractionError: If the file cannot be read or parsed.
+        """
+        content_hash = await asyncio.to_thread(hash_file, file_path)
+        pages = await asyncio.to_thread(self._cache_get, content_hash)
+        if pages is not None:
+            return ExtractedPdf(file_path=file_path, content_hash=content_hash, pages=pages, cached=True)
+
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        try:
+            page_count = await loop.run_in_executor(pool, count_pages, file_path)
+            ranges = await asyncio.gather(*(
+                loop.run_in_executor(pool, extract_page_range, file_path, start, min(start + self.pages_per_task, page_count))
+                for start in range(0, page_count, self.pages_per_task)
+            ))
+        except BrokenProcessPool as exc:
+            self._discard_pool(pool)
+            raise PdfExtractionError(file_path, "parse", f"Parse process died: {exc}") from None
+        pages = [text for texts in ranges for text in texts]
+
+        await asyncio.to_thread(self._cache_put, content_hash, pages)
+        return ExtractedPdf(file_path=file_path, content_hash=content_hash, pages=pages, cached=False)
+
+    def extract(self, file_path: str) -> ExtractedPdf:
+        """
+        Blocking variant of `aextract`, for synchronous callers.
+
+        Args:
+            file_path: Path of the PDF.
+
+        Returns:
+            The extracted pages.
+
+        Raises:
+            PdfExtractionError: If the file cannot be read or parsed.
+        """
+        content_hash = hash_file(file_path)
+        pages = self._cache_get(content_hash)
+        if pages is not None:
+            return ExtractedPdf(file_path=file_path, content_hash=content_hash, pages=pages, cached=True)
+
+        pool = self.pool
+        try:
+            page_count = pool.submit(count_pages, file_path).result()
+            futures = [
+                pool.submit(extract_page_range, file_path, start, min(start + self.pages_per_task, page_count))
+                for start in range(0, page_count, self.pages_per_task)
+            ]
+            pages = [text for future in futures for text in future.result()]
+        except BrokenProcessPool as exc:
+            self._discard_pool(pool)
+            raise PdfExtractionError(file_path, "parse", f"Parse process died: {exc}") from None
+
+        self._cache_put(content_hash, pages)
+        return ExtractedPdf(file_path=file_path, content_hash=content_hash, pages=pages, cached=False)
+
+    def _cache_get(self, content_hash: str) -> List[str] | None:
+        if content_hash in self._memory:
+            self._memory.move_to_end(content_hash)
+            return self._memory[content_hash]
+
+        if self.cache_dir is None:
+            return None
+        try:
+            pages = json.loads((self.cache_dir / f"{content_hash}.json").read_text(encoding="utf-8"))["pages"]
+        except (OSError, ValueError, KeyError):
+            # Missing or corrupt entries are treated as a miss and overwritten
+            return None
+        self._remember(content_hash, pages)
+        return pages
+
+    def _cache_put(self, content_hash: str, pages: List[str]) -> None:
+        self._remember(content_hash, pages)
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename, so concurrent readers never see a partial entry
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.cache_dir, suffix=".tmp", delete=False) as tmp:
+                json.dump({"pages": pages}, tmp)
+            os.replace(tmp.name, self.cache_dir / f"{content_hash}.json")
+        except OSError:
+            # The disk cache is an optimization; extraction already succeeded
+            pass
+
+    def _remember(self, content_hash: str, pages: List[str]) -> None:
+        self._memory[content_hash] = pages
+        self._memory.move_to_end(content_hash)
+        while len(self._memory) > self.memory_cache_size:
+            self._memory.popitem(last=False)
+
+
+# Process-wide extractor; the pool is started on first use
+pdf_extractor = PdfExtractor()
@@ -7,8 +7,10 @@ from langgraph.graph import START, END, StateGraph
 from ai_design_patterns.planning.plan_n_execute.state import State
 from ai_design_patterns.planning.plan_n_execute.llm import llm
 from ai_design_patterns.planning.plan_n_execute.planner import planner, replanner, Response
+from ai_design_patterns.runtime.single_flight import coalesced_tool
 
-tools = [TavilySearch(max_results=5)]
+# Parallel plan steps often issue the same search; identical in-flight queries share one Tavily call
+tools = [coalesced_tool(TavilySearch(max_results=5))]
 
 prompt = "You are helpful assistant"
 agent_executor = create_agent(system_prompt=prompt, model=llm, tools=tools)
@@ -48,7 +50,7 @@ def should_end(state: State):
 
 
 
-async def main():
+def build_app():
     workflow = StateGraph(State)
 
     workflow.add_node("planner", plan_step)
@@ -66,7 +68,11 @@ async def main():
         ["agent", END],
     )
 
-    app = workflow.compile()
+    return workflow.compile()
+
+
+async def main():
+    app = build_app()
 
     config = {"recursion_limit": 50}
 
@@ -5,6 +5,7 @@ from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 
 from ai_design_patterns.planning.plan_n_execute.llm import llm
+from ai_design_patterns.runtime.structured_output import repairing_structured_output
 
 class Plan(BaseModel):
     """Plan to follow in future"""
@@ -38,7 +39,7 @@ The result of the final step should be the final answer. Make sure that each ste
     ]
 )
 
-planner = planner_prompt | llm.with_structured_output(Plan)
+planner = planner_prompt | repairing_structured_output(llm, Plan)
 
 
 replanner_prompt = ChatPromptTemplate.from_template(
@@ -58,8 +59,11 @@ You have currently done the follow steps:
 Update your plan accordingly. If no more steps are needed and you can return to the user, then respond with that. Otherwise, fill out the plan. Only add steps to the plan that still NEED to be done. Do not return previously done steps as part of the plan."""
 )
 
-replanner = replanner_prompt | ChatOllama(
-    model = "qwen3:8b", #Thinking model
-    temperature=0.0
-).with_structured_output(Act)
+replanner = replanner_prompt | repairing_structured_output(
+    ChatOllama(
+        model = "qwen3:8b", #Thinking model
+        temperature=0.0
+    ),
+    Act,
+)
 
@@ -5,6 +5,7 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 
 from ai_design_patterns.data_models.product import Product
+from ai_design_patterns.runtime.structured_output import repairing_structured_output
 
 # Define the language model to use (OpenRouter)
 MODEL = "x-ai/grok-4.1-fast"
@@ -32,14 +33,17 @@ enricher_template = ChatPromptTemplate(
     ]
 )
 
-# Configure the language model to output structured data based on the Product data model
-structured_llm = llm.with_structured_output(Product)
+# Configure the language model to output structured data based on the Product data model.
+# Slightly malformed output (e.g. "laptop" for "Laptops", "$999" as price) is repaired locally instead of re-asking the LLM.
+structured_llm = repairing_structured_output(llm, Product)
 
 # Create a chain for extraction: extractor_template -> structured_llm
 extract_chain = extractor_template | structured_llm
 
 # Create a full chain: extract_chain -> enricher_template -> structured_llm
-full_chain = ( {"json_data": extract_chain} | enricher_template | llm.with_structured_output(Product) )
+full_chain = ( {"json_data": extract_chain} | enricher_template | repairing_structured_output(llm, Product) )
 
-# Invoke the full chain with an example text and print the result
-result = full_chain.invoke({"text":{"The new iPhone 15 Pro Max features a titanium design, the A17 Pro chip, and an advanced camera system with a 5x optical zoom telephoto lens. It comes with 256GB, 512GB, or 1TB of storage."}})
+if __name__ == "__main__":
+    # Invoke the full chain with an example text and print the result
+    result = full_chain.invoke({"text":{"The new iPhone 15 Pro Max features a titanium design, the A17 Pro chip, and an advanced camera system with a 5x optical zoom telephoto lens. It comes with 256GB, 512GB, or 1TB of storage."}})
+    print(result)
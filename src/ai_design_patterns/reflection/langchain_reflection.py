@@ -7,10 +7,12 @@ The agent consists of three main components:
 3. A pitch revision chain (`pitch_revisor`) that summarizes pitch history for reflection.
 
 The `run_reflection_agent` function orchestrates these components to generate the best possible pitch within a given number of iterations.
+`astream_reflection_agent` runs the same loop asynchronously and streams pitch tokens, candidates and scores as they are produced.
 """
 
 import os
-from typing import Literal
+import asyncio
+from typing import Any, AsyncIterator, Dict, Literal
 from dotenv import load_dotenv
 
 from langchain_openai import ChatOpenAI
@@ -19,6 +21,10 @@ from langchain_core.output_parsers import StrOutputParser
 
 from pydantic import BaseModel, Field
 
+from ai_design_patterns.runtime.hedging import hedge_config, hedged
+from ai_design_patterns.runtime.structured_output import repairing_structured_output
+from ai_design_patterns.runtime.streaming import StreamTiming, timed_stream
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -57,6 +63,25 @@ llm_eval = ChatOpenAI(
     temperature=0.5
 )
 
+# Backup models for hedged calls: they take over calls that are slower than the primary's recent latency percentile
+llm_backup = ChatOpenAI(
+    model=hedge_config("reflection").backup_model,
+    api_key=os.environ["OPENAI_KEY"],
+    base_url=os.environ["OPENAI_BASE_URL"],
+    temperature=0.8
+)
+
+llm_eval_backup = ChatOpenAI(
+    model=hedge_config("evaluation").backup_model,
+    api_key=os.environ["OPENAI_KEY"],
+    base_url=os.environ["OPENAI_BASE_URL"],
+    temperature=0.5
+)
+
+# Async calls are hedged, streamed generation on time to first token (see astream_reflection_agent);
+# the synchronous run_reflection_agent only calls the primaries
+hedged_llm = hedged(llm, llm_backup, role="reflection")
+
 
 # Define the pitch generation chain
 pitch_gen_chain = (
@@ -75,7 +100,7 @@ Feedback from critic for most recent pitch: {{feedback}}
 """,
         template_format="jinja2"
     )
-    | llm
+    | hedged_llm
     | StrOutputParser()
 )
 
@@ -93,7 +118,11 @@ User Pitch: {pitch}
 Output ONLY JSON
 """
     )
-    | llm_eval.with_structured_output(Reflection)
+    | hedged(
+        repairing_structured_output(llm_eval, Reflection),
+        repairing_structured_output(llm_eval_backup, Reflection),
+        role="evaluation",
+    )
 )
 
 
@@ -112,7 +141,7 @@ Latest Pitch: {new_pitch}
 Latest Feedback: {feedback}
 """
     )
-    | llm
+    | hedged_llm
     | StrOutputParser()
 )
 
@@ -156,8 +185,79 @@ def run_reflection_agent(idea: str, max_iters: int = 5) -> str:
 
     return best_pitch[0]['pitch']
 
+
+async def astream_reflection_agent(idea: str, max_iters: int = 5) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs the reflection agent like `run_reflection_agent`, streaming its progress as events.
+
+    Args:
+        idea (str): The initial business idea for which to generate a pitch.
+        max_iters (int): The maximum number of iterations to refine the pitch.
+
+    Yields:
+        dict: Events, each with an "event" key:
+            - "token": {"iteration", "content"} for every generated pitch chunk.
+            - "candidate": {"iteration", "pitch"} once a pitch is fully generated.
+            - "score": {"iteration", "score", "critique", "continue_"} once the pitch is evaluated.
+            - "best": {"pitch", "score"} after the last iteration, with the best scored pitch.
+    """
+    feedback = None
+    current_memory_ctx = None
+
+    all_pitches = []
+
+    for itr in range(0, max_iters):
+        # Generate a new pitch, forwarding tokens as they arrive
+        chunks = []
+        async for chunk in pitch_gen_chain.astream({"user_input": idea, "feedback": feedback, "memory": current_memory_ctx}):
+            if chunk:
+                chunks.append(chunk)
+                yield {"event": "token", "iteration": itr + 1, "content": chunk}
+        current_pitch = "".join(chunks)
+        yield {"event": "candidate", "iteration": itr + 1, "pitch": current_pitch}
+
+        # Evaluate the generated pitch
+        feedback = await pitch_eval_chain.ainvoke({"pitch": current_pitch, "c_iter": itr + 1, "max_iters": max_iters})
+        yield {
+            "event": "score",
+            "iteration": itr + 1,
+            "score": feedback.score,
+            "critique": feedback.critique,
+            "continue_": feedback.continue_,
+        }
+
+        all_pitches.append({"pitch": current_pitch, "score": feedback.score})
+
+        if feedback.continue_ == "no":
+            break
+
+        current_memory_ctx = await pitch_revisor.ainvoke({"memory": current_memory_ctx, "new_pitch": current_pitch, "feedback": feedback})
+
+    best = max(all_pitches, key=lambda pitch: pitch['score'])
+    yield {"event": "best", "pitch": best["pitch"], "score": best["score"]}
+
+
+async def stream_main(idea: str) -> None:
+    """
+    Prints the reflection agent's candidates and scores as they stream in, followed by the stream timing.
+
+    Args:
+        idea (str): The initial business idea for which to generate a pitch.
+    """
+    timing = StreamTiming("reflection")
+    async for event in timed_stream(astream_reflection_agent(idea), timing):
+        if event["event"] == "token":
+            print(event["content"], end="", flush=True)
+        elif event["event"] == "candidate":
+            print()
+        elif event["event"] == "score":
+            print(f"Iteration {event['iteration']} score: {event['score']} (continue: {event['continue_']})")
+        elif event["event"] == "best":
+            print("Final Best Pitch:")
+            print(event["pitch"])
+    print(timing)
+
+
 if __name__ == "__main__":
     # Example usage of the reflection agent
-    final_pitch = run_reflection_agent("Business idea for dating and effective matchmaking, tailored towards male pain point: lack of courage to pickup in real life")
-    print("Final Best Pitch:")
-    print(final_pitch)
+    asyncio.run(stream_main("Business idea for dating and effective matchmaking, tailored towards male pain point: lack of courage to pickup in real life"))
@@ -1,5 +1,6 @@
 import os
-from typing import Literal
+import asyncio
+from typing import AsyncIterator, Literal
 from pydantic import BaseModel, Field
 
 from dotenv import load_dotenv; load_dotenv()
@@ -9,6 +10,11 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.runnables import RunnableBranch, RunnablePassthrough
 
+from ai_design_patterns.runtime.hedging import hedge_config, hedged
+from ai_design_patterns.runtime.single_flight import coalesced
+from ai_design_patterns.runtime.structured_output import repairing_structured_output
+from ai_design_patterns.runtime.streaming import StreamTiming, timed_stream
+
 # Define the language model to be used.
 # Consider using a model that supports structured output for best results.
 MODEL ="google/gemini-2.5-flash"
@@ -22,7 +28,7 @@ class RouteQuery(BaseModel):
         route: The determined sentiment route: "positive", "negative", or "neutral".
     """
     reasoning: str = Field(description="Reasoning for the chosen route.")
-    confidence: float = Field(description="Confidence score of the route, from 0.0 to 1.0.")
+    confidence: float = Field(ge=0.0, le=1.0, description="Confidence score of the route, from 0.0 to 1.0.")
     route: Literal["positive", "negative", "neutral"] = Field(description="Determined route for the query.")
 
 
@@ -35,6 +41,15 @@ llm = ChatOpenAI(
     temperature=0.1
 )
 
+# Backup model for hedged calls: takes over calls that are slower than the primary's recent latency percentile
+llm_backup = ChatOpenAI(
+    model=hedge_config("routing").backup_model,
+    api_key=os.environ["OPENAI_KEY"],
+    base_url=os.environ["OPENAI_BASE_URL"],
+    temperature=0.1
+)
+hedged_llm = hedged(llm, llm_backup, role="routing")
+
 # Prompt template for handling negative user queries, focusing on empathy and support.
 support = ChatPromptTemplate.from_template(
     "Answer this negative user query with human like language and empathy, support him in solving the issue. User Query:\n\n{input}"
@@ -52,24 +67,32 @@ faq = ChatPromptTemplate.from_template(
 
 
 # Chain for classifying the sentiment of a user's question.
-# It uses the LLM with structured output to parse the response into a RouteQuery object.
+# It uses the LLM with structured output to parse the response into a RouteQuery object, repairing malformed output locally.
+# Model calls are hedged (see runtime.hedging) and coalesced: concurrent identical queries share one upstream request.
 sentiment_classifier = (
     ChatPromptTemplate.from_template("Classify the user provided question sentiment as neutral, positive or negative. Respond according to provided output scheme. User question: \n{input}")
-    | llm.with_structured_output(RouteQuery)
+    | coalesced(
+        hedged(
+            repairing_structured_output(llm, RouteQuery),
+            repairing_structured_output(llm_backup, RouteQuery),
+            role="routing",
+        ),
+        label="routing.classifier",
+    )
 )
 
 # Chains for each sentiment route, combining a specific prompt with the LLM.
-support_chain = support | llm
-upsell_chain = upsell | llm
-faq_chain = faq | llm
+support_chain = support | coalesced(hedged_llm, label="routing.support")
+upsell_chain = upsell | coalesced(hedged_llm, label="routing.upsell")
+faq_chain = faq | coalesced(hedged_llm, label="routing.faq")
 
 # The routing mechanism, a RunnableBranch, directs the flow based on the sentiment classification.
-# It checks the 'route' field from the sentiment_classifier output and directs to the appropriate chain.
+# It checks the 'route' field of the RouteQuery produced by sentiment_classifier and directs to the appropriate chain.
 # A fallback (faq_chain) is provided for cases where no specific route matches.
 router = RunnableBranch(
-    (lambda x: x["route"] == "positive", upsell_chain),
-    (lambda x: x["route"] == "negative", support_chain),
-    (lambda x: x["route"] == "neutral", faq_chain),
+    (lambda x: x["route"].route == "positive", upsell_chain),
+    (lambda x: x["route"].route == "negative", support_chain),
+    (lambda x: x["route"].route == "neutral", faq_chain),
     faq_chain # fallback
 )
 
@@ -83,6 +106,39 @@ routed_chain = (
     | router
 )
 
-# Invoke the routed chain with an example query and print the result.
-result = routed_chain.invoke("This AI routing pattern is fantastic! How can I integrate it with more chains?")
-print(result)
+
+async def astream_route(query: str) -> AsyncIterator[str]:
+    """
+    Route a user query and stream the selected branch's answer token by token.
+
+    The sentiment classification has to finish before a branch can be selected,
+    so the first token arrives after the classifier call plus the branch's own first token.
+
+    Args:
+        query: The user query to route.
+
+    Yields:
+        Non-empty text chunks of the selected branch's answer.
+    """
+    async for chunk in routed_chain.astream(query):
+        if chunk.content:
+            yield chunk.content
+
+
+async def stream_main(query: str) -> None:
+    """
+    Print the routed answer as it streams in, followed by the stream timing.
+
+    Args:
+        query: The user query to route.
+    """
+    timing = StreamTiming("routing")
+    async for token in timed_stream(astream_route(query), timing):
+        print(token, end="", flush=True)
+    print()
+    print(timing)
+
+
+if __name__ == "__main__":
+    # Route an example query and print the answer as it streams in.
+    asyncio.run(stream_main("This AI routing pattern is fantastic! How can I integrate it with more chains?"))
@@ -0,0 +1,39 @@
+"""
+Base class of the runtime's runnable wrappers.
+
+`RunnableBinding` rebuilds itself in `bind`, `with_config`, `with_listeners`, `with_types` and
+`with_retry` with `self.__class__(bound=..., kwargs=..., config=...)`, which resets any field a
+subclass declares (a hedged call's backup and role, a single-flight call's label) to its default.
+`WrapperBinding` copies those fields over to the rebuilt wrapper.
+"""
+
+from typing import Any
+
+from langchain_core.runnables import Runnable, RunnableBinding, RunnableConfig
+
+
+class WrapperBinding(RunnableBinding):
+    """
+    RunnableBinding whose own fields survive `bind`, `with_config` and the other rebuilding helpers.
+    """
+
+    def _carry_fields(self, binding: Runnable) -> Runnable:
+        if type(binding) is type(self):
+            for name in type(self).model_fields.keys() - RunnableBinding.model_fields.keys():
+                setattr(binding, name, getattr(self, name))
+        return binding
+
+    def bind(self, **kwargs: Any) -> Runnable:
+        return self._carry_fields(super().bind(**kwargs))
+
+    def with_config(self, config: RunnableConfig | None = None, **kwargs: Any) -> Runnable:
+        return self._carry_fields(super().with_config(config, **kwargs))
+
+    def with_listeners(self, **kwargs: Any) -> Runnable:
+        return self._carry_fields(super().with_listeners(**kwargs))
+
+    def with_types(self, **kwargs: Any) -> Runnable:
+        return self._carry_fields(super().with_types(**kwargs))
+
+    def with_retry(self, **kwargs: Any) -> Runnable:
+        return self._carry_fields(super().with_retry(**kwargs))
@@ -0,0 +1,346 @@
+"""
+Hedged requests with latency-based fallback to an alternate model.
+
+A hedged call starts on the primary model. If it has not finished after the role's adaptive
+hedge delay (a high percentile of recent primary latencies), the same request is sent to the
+role's backup model. Whichever finishes first wins and the other is cancelled. If one side
+fails, the other one is still awaited; only when both fail does the call fail.
+
+Streamed calls are hedged on time to first chunk: if the primary has not produced a chunk after
+the role's streaming hedge delay, the backup stream is started, and the stream that produces
+the first chunk is consumed to the end while the other is cancelled. Once a chunk has been
+yielded there is no fallback, so errors later in the winning stream are raised.
+
+The extra cost of hedging is reported as `extra_requests`, the number of backup requests sent.
+Each is billed at least for its prompt: a cancelled request may already have generated tokens,
+and providers do not report the usage of requests cancelled mid-flight.
+
+Each role ("parallel", "evaluation", "routing", "reflection", "tools") has its own
+`HedgeConfig`, latency window and stats. Backup models can be overridden with
+`HEDGE_<ROLE>_BACKUP_MODEL` environment variables.
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, TypeVar
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from ai_design_patterns.runtime.bindings import WrapperBinding
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class HedgeConfig:
+    """
+    Hedging configuration of a model role.
+
+    Attributes:
+        backup_model: Model the backup request is sent to.
+        percentile: Percentile of recent primary latencies after which a backup request is sent.
+        initial_delay_s: Hedge delay used until `min_samples` latencies have been observed.
+        min_delay_s: Lower bound of the hedge delay.
+        max_delay_s: Upper bound of the hedge delay.
+        min_samples: Number of observed latencies before the percentile is trusted.
+        window: Number of most recent primary latencies the percentile is computed over.
+            Streamed calls keep a separate window of times to first chunk.
+        max_hedge_ratio: Maximum share of calls that may be hedged, bounding the extra load.
+        enabled: Whether calls of this role are hedged at all.
+    """
+    backup_model: str
+    percentile: float = 0.95
+    initial_delay_s: float = 10.0
+    min_delay_s: float = 0.5
+    max_delay_s: float = 60.0
+    min_samples: int = 20
+    window: int = 200
+    max_hedge_ratio: float = 0.1
+    enabled: bool = True
+
+
+# Backups are a different provider than the primary, so a slow provider doesn't slow both requests
+HEDGE_CONFIGS: Dict[str, HedgeConfig] = {
+    "parallel": HedgeConfig(backup_model="google/gemini-2.5-flash"),
+    "evaluation": HedgeConfig(backup_model="google/gemini-2.5-flash"),
+    "routing": HedgeConfig(backup_model="x-ai/grok-4.1-fast", initial_delay_s=3.0),
+    "reflection": HedgeConfig(backup_model="x-ai/grok-4.1-fast"),
+    "tools": HedgeConfig(backup_model="x-ai/grok-4.1-fast"),
+}
+
+
+def hedge_config(role: str) -> HedgeConfig:
+    """
+    Configuration of a role, with the backup model overridable from the environment.
+
+    Args:
+        role: The model role.
+
+    Returns:
+        The role's HedgeConfig.
+    """
+    config = HEDGE_CONFIGS[role]
+    backup_model = os.environ.get(f"HEDGE_{role.upper()}_BACKUP_MODEL")
+    return replace(config, backup_model=backup_model) if backup_model else config
+
+
+class Hedger:
+    """
+    Runs hedged calls for one role and tracks their latency and outcomes.
+
+    Args:
+        config: Hedging configuration of the role.
+    """
+
+    def __init__(self, config: HedgeConfig):
+        self.config = config
+        self._latencies: deque[float] = deque(maxlen=config.window)
+        self._first_chunk_latencies: deque[float] = deque(maxlen=config.window)
+        self.counters: Dict[str, int] = {
+            "calls": 0,
+            "hedged": 0,
+            "primary_wins": 0,
+            "backup_wins": 0,
+            "failed": 0,
+            "extra_requests": 0,
+        }
+
+    def delay(self, streaming: bool = False) -> float:
+        """
+        Current hedge delay: the configured percentile of recent primary latencies.
+
+        Args:
+            streaming: Whether to return the delay of streamed calls, computed over times to first chunk.
+        """
+        observed = self._first_chunk_latencies if streaming else self._latencies
+        if len(observed) < self.config.min_samples:
+            delay = self.config.initial_delay_s
+        else:
+            latencies = sorted(observed)
+            delay = latencies[min(len(latencies) - 1, int(self.config.percentile * len(latencies)))]
+        return min(max(delay, self.config.min_delay_s), self.config.max_delay_s)
+
+    def _may_hedge(self) -> bool:
+        if not self.config.enabled:
+            return False
+        return self.counters["hedged"] < self.config.max_hedge_ratio * self.counters["calls"]
+
+    async def run(self, primary: Callable[[], Awaitable[T]], backup: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `primary`, hedging with `backup` if it is slower than the hedge delay.
+
+        Args:
+            primary: Zero-argument coroutine function calling the primary model.
+            backup: Zero-argument coroutine function calling the backup model.
+
+        Returns:
+            The result of whichever call succeeded first.
+
+        Raises:
+            Exception: The primary's exception if both calls failed (or if the primary failed unhedged).
+        """
+        self.counters["calls"] += 1
+        started = time.perf_counter()
+        primary_task = asyncio.ensure_future(primary())
+        primary_task.add_done_callback(lambda task: self._observe(task, started, self._latencies))
+
+        tasks = {primary_task: "primary"}
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.delay())
+            if not done and self._may_hedge():
+                self.counters["hedged"] += 1
+                self.counters["extra_requests"] += 1
+                tasks[asyncio.ensure_future(backup())] = "backup"
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if not task.cancelled() and task.exception() is None]
+                if winners:
+                    winner = primary_task if primary_task in winners else winners[0]
+                    if len(tasks) > 1:
+                        self.counters[f"{tasks[winner]}_wins"] += 1
+                        self._observe_lost_primary(primary_task, started, self._latencies)
+                    return winner.result()
+
+            self.counters["failed"] += 1
+            return primary_task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream(
+        self, primary: Callable[[], AsyncIterator[T]], backup: Callable[[], AsyncIterator[T]]
+    ) -> AsyncIterator[T]:
+        """
+        Stream from `primary`, hedging with `backup` if its first chunk is slower than the streaming hedge delay.
+
+        Args:
+            primary: Zero-argument function returning the primary model's stream.
+            backup: Zero-argument function returning the backup model's stream.
+
+        Yields:
+            The chunks of whichever stream produced a chunk first.
+
+        Raises:
+            Exception: The primary's exception if both streams failed before their first chunk
+                (or if the primary failed unhedged), or any error raised later by the winning stream.
+        """
+        self.counters["calls"] += 1
+        started = time.perf_counter()
+        streams = {"primary": primary()}
+        primary_task = asyncio.ensure_future(_first_chunk(streams["primary"]))
+        primary_task.add_done_callback(lambda task: self._observe(task, started, self._first_chunk_latencies))
+
+        tasks = {primary_task: "primary"}
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.delay(streaming=True))
+            if not done and self._may_hedge():
+                self.counters["hedged"] += 1
+                self.counters["extra_requests"] += 1
+                streams["backup"] = backup()
+                tasks[asyncio.ensure_future(_first_chunk(streams["backup"]))] = "backup"
+
+            winner = None
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if not task.cancelled() and task.exception() is None]
+                if winners:
+                    winner = primary_task if primary_task in winners else winners[0]
+                    if len(tasks) > 1:
+                        self.counters[f"{tasks[winner]}_wins"] += 1
+                        self._observe_lost_primary(primary_task, started, self._first_chunk_latencies)
+
+            if winner is None:
+                self.counters["failed"] += 1
+                primary_task.result()
+            # Stop paying for the losing stream before consuming the winner
+            await _close({task: name for task, name in tasks.items() if task is not winner}, streams)
+
+            first = winner.result()
+            if first is _EXHAUSTED:
+                return
+            yield first
+            async for chunk in streams[tasks[winner]]:
+                yield chunk
+        finally:
+            await _close(tasks, streams)
+
+    def _observe(self, task: asyncio.Future, started: float, latencies: deque[float]) -> None:
+        # Cancelled primaries are skipped: callers cancel calls at any time (timeouts, abandoned
+        # streams), and such samples would pull the hedge delay down
+        if not task.cancelled() and task.exception() is None:
+            latencies.append(time.perf_counter() - started)
+
+    def _observe_lost_primary(self, primary_task: asyncio.Future, started: float, latencies: deque[float]) -> None:
+        # A primary still running when the backup won takes at least this long; recording the
+        # lower bound keeps slow primaries from vanishing out of the percentile
+        if not primary_task.done():
+            latencies.append(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.counters["calls"]
+        hedged = self.counters["hedged"]
+        return {
+            "backup_model": self.config.backup_model,
+            **self.counters,
+            "hedge_rate": round(hedged / calls, 4) if calls else 0.0,
+            "backup_win_rate": round(self.counters["backup_wins"] / hedged, 4) if hedged else 0.0,
+            "hedge_delay_s": round(self.delay(), 4),
+            "stream_hedge_delay_s": round(self.delay(streaming=True), 4),
+        }
+
+
+_EXHAUSTED = object()
+
+
+async def _first_chunk(stream: AsyncIterator[T]) -> Any:
+    # Returns a sentinel rather than raising StopAsyncIteration, which a task cannot propagate cleanly
+    return await anext(stream, _EXHAUSTED)
+
+
+async def _close(tasks: Dict[asyncio.Future, str], streams: Dict[str, AsyncIterator[Any]]) -> None:
+    for task in tasks:
+        task.cancel()
+    # A stream can only be closed once its pending read has been cancelled
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for name in tasks.values():
+        if hasattr(streams[name], "aclose"):
+            await streams[name].aclose()
+
+
+_hedgers: Dict[str, Hedger] = {}
+
+
+def hedger(role: str) -> Hedger:
+    """Process-wide Hedger of a role, created on first use."""
+    if role not in _hedgers:
+        _hedgers[role] = Hedger(hedge_config(role))
+    return _hedgers[role]
+
+
+def hedging_stats() -> Dict[str, Any]:
+    """Hedge rate, wins and extra requests of every role used so far."""
+    return {role: role_hedger.stats() for role, role_hedger in _hedgers.items()}
+
+
+class RunnableHedged(WrapperBinding):
+    """
+    Runnable wrapper hedging `ainvoke` and async streaming calls of the wrapped (primary) runnable with a backup runnable.
+
+    Async streams are hedged on time to first chunk, including when the runnable is a step of a
+    streamed sequence. Sync and batch calls are passed through to the primary unchanged.
+    """
+
+    backup: Runnable | None = None
+    role: str = "default"
+
+    async def ainvoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        config = self._merge_configs(config)
+        kwargs = {**self.kwargs, **kwargs}
+        if self.backup is None:
+            return await self.bound.ainvoke(input, config, **kwargs)
+        return await hedger(self.role).run(
+            lambda: self.bound.ainvoke(input, config, **kwargs),
+            lambda: self.backup.ainvoke(input, config, **kwargs),
+        )
+
+    async def astream(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> AsyncIterator[Any]:
+        config = self._merge_configs(config)
+        kwargs = {**self.kwargs, **kwargs}
+        if self.backup is None:
+            stream = self.bound.astream(input, config, **kwargs)
+        else:
+            stream = hedger(self.role).stream(
+                lambda: self.bound.astream(input, config, **kwargs),
+                lambda: self.backup.astream(input, config, **kwargs),
+            )
+        async for chunk in stream:
+            yield chunk
+
+    async def atransform(
+        self, input: AsyncIterator[Any], config: RunnableConfig | None = None, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        # Sequences stream through atransform: buffer the input (a prompt, for model calls) and
+        # hedge it through astream, since an input stream cannot be replayed to the backup
+        async for chunk in Runnable.atransform(self, input, config, **kwargs):
+            yield chunk
+
+
+def hedged(primary: Runnable, backup: Runnable, role: str) -> Runnable:
+    """
+    Wrap a model call so that slow calls are hedged with the same call on a backup model.
+
+    Args:
+        primary: The runnable calling the role's primary model.
+        backup: The same runnable built on the role's backup model (see `hedge_config`).
+        role: The model role, selecting configuration and stats.
+
+    Returns:
+        A runnable with the primary's behavior whose `ainvoke` and async streaming calls are hedged.
+    """
+    return RunnableHedged(bound=primary, backup=backup, role=role)
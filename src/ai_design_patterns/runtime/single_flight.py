@@ -0,0 +1,219 @@
+"""
+Single-flight coalescing of identical in-flight LLM and tool calls.
+
+When several concurrent callers send the same request (same model, same parameters,
+same prompt), only the first one goes upstream; the others await its result. A call is
+only shared while it is in flight, so this is not a cache: the next identical call after
+completion goes upstream again.
+
+Cancellation is per caller: a cancelled caller stops waiting, but the upstream call keeps
+running for the remaining callers and is cancelled only when nobody waits for it anymore.
+Errors are delivered to every caller sharing the call.
+"""
+
+import asyncio
+import hashlib
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from pydantic import BaseModel, Field
+
+from langchain_core.load import dumps
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable, RunnableBinding, RunnableConfig, RunnableSequence
+from langchain_core.tools import BaseTool, StructuredTool
+
+from ai_design_patterns.runtime.bindings import WrapperBinding
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Registry of in-flight calls, keyed by request identity.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"requests": 0, "upstream_calls": 0, "coalesced": 0})
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], label: str = "default") -> T:
+        """
+        Run `fn` unless an identical call is already in flight, and return the shared result.
+
+        Args:
+            key: Identity of the request; calls with equal keys are coalesced.
+            fn: Zero-argument coroutine function performing the upstream call.
+            label: Name of the call site, used to break down the stats.
+
+        Returns:
+            The result of the (possibly shared) upstream call.
+
+        Raises:
+            Exception: Whatever the upstream call raised, delivered to every sharing caller.
+        """
+        counters = self._counters[label]
+        counters["requests"] += 1
+
+        call = self._calls.get(key)
+        if call is None:
+            counters["upstream_calls"] += 1
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            counters["coalesced"] += 1
+
+        call.waiters += 1
+        try:
+            # Shield so that one caller's cancellation doesn't cancel the call for everyone
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                self._forget(key, call)
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Coalescing counters, overall and per call site.
+
+        Returns:
+            A JSON-serializable dictionary. `coalescing_rate` is the share of requests that
+            were served by another caller's upstream call.
+        """
+        def with_rate(counters: Dict[str, int]) -> Dict[str, Any]:
+            rate = counters["coalesced"] / counters["requests"] if counters["requests"] else 0.0
+            return {**counters, "coalescing_rate": round(rate, 4)}
+
+        total = {"requests": 0, "upstream_calls": 0, "coalesced": 0}
+        for counters in self._counters.values():
+            for name, value in counters.items():
+                total[name] += value
+
+        return {
+            **with_rate(total),
+            "in_flight": len(self._calls),
+            "by_label": {label: with_rate(counters) for label, counters in self._counters.items()},
+        }
+
+
+# Process-wide registry shared by all coalesced runnables and tools
+default_flight = SingleFlight()
+
+
+def runnable_signature(runnable: Runnable, **kwargs: Any) -> str:
+    """
+    Describe the model and parameters a runnable calls, for use in a request key.
+
+    Chat models are described by their LangChain cache key (model name and invocation
+    parameters, including bound tools and response formats); bindings contribute their
+    bound kwargs; sequences the signatures of their steps.
+
+    Args:
+        runnable: The runnable to describe.
+        **kwargs: Kwargs bound on top of the runnable.
+
+    Returns:
+        A string that is equal for runnables making identical upstream calls.
+    """
+    if isinstance(runnable, RunnableBinding):
+        return runnable_signature(runnable.bound, **{**runnable.kwargs, **kwargs})
+    if isinstance(runnable, BaseChatModel):
+        return runnable._get_llm_string(**kwargs)
+    if isinstance(runnable, RunnableSequence):
+        return " | ".join(runnable_signature(step) for step in runnable.steps)
+    if isinstance(runnable, BaseModel):
+        # Parsers, prompts and tools are pydantic models with a deterministic repr
+        return f"{type(runnable).__qualname__}:{runnable!r}"
+    return f"{type(runnable).__qualname__}:{id(runnable)}"
+
+
+def request_key(signature: str, input: Any, **kwargs: Any) -> str:
+    """
+    Hash a runnable signature and its input into a single-flight key.
+
+    Args:
+        signature: Signature of the called runnable (see `runnable_signature`).
+        input: Input of the call (prompt value, messages, dict, ...).
+        **kwargs: Call-time kwargs.
+
+    Returns:
+        Hex digest identifying the request.
+    """
+    payload = dumps({"input": input, "kwargs": kwargs}, sort_keys=True)
+    return hashlib.sha256(f"{signature}\0{payload}".encode()).hexdigest()
+
+
+class RunnableSingleFlight(WrapperBinding):
+    """
+    Runnable wrapper coalescing identical concurrent `ainvoke` calls.
+
+    Streaming, sync and batch calls are passed through to the wrapped runnable unchanged.
+    """
+
+    label: str = "default"
+    flight: SingleFlight = Field(default=default_flight, exclude=True)
+
+    async def ainvoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        kwargs = {**self.kwargs, **kwargs}
+        key = request_key(runnable_signature(self.bound), input, **kwargs)
+        return await self.flight.do(
+            key,
+            lambda: self.bound.ainvoke(input, self._merge_configs(config), **kwargs),
+            label=self.label,
+        )
+
+
+def coalesced(runnable: Runnable, label: str = "default", flight: SingleFlight = default_flight) -> Runnable:
+    """
+    Wrap a model call (a chat model, or a chat model with structured output) in single-flight.
+
+    Args:
+        runnable: The runnable making the upstream call.
+        label: Name of the call site, used to break down the stats.
+        flight: Registry to coalesce in.
+
+    Returns:
+        A runnable with the same behavior whose concurrent identical `ainvoke` calls share one upstream call.
+    """
+    return RunnableSingleFlight(bound=runnable, label=label, flight=flight)
+
+
+def coalesced_tool(tool: BaseTool, flight: SingleFlight = default_flight) -> BaseTool:
+    """
+    Wrap a tool so that concurrent identical async invocations share one upstream call.
+
+    Args:
+        tool: The tool to wrap.
+        flight: Registry to coalesce in.
+
+    Returns:
+        A tool with the same name, description and arguments schema.
+    """
+    signature = runnable_signature(tool)
+
+    def run(**tool_input: Any) -> Any:
+        return tool.invoke(tool_input)
+
+    async def arun(**tool_input: Any) -> Any:
+        key = request_key(signature, tool_input)
+        return await flight.do(key, lambda: tool.ainvoke(tool_input), label=f"tool.{tool.name}")
+
+    return StructuredTool.from_function(
+        func=run,
+        coroutine=arun,
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+    )
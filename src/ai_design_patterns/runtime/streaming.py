@@ -0,0 +1,50 @@
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class StreamTiming:
+    """
+    Timing of a single streamed pattern run.
+
+    Attributes:
+        name: Label of the measured stream (usually the pattern name).
+        first_item_s: Seconds from the start of the stream until the first useful item arrived.
+        total_s: Seconds from the start of the stream until it was exhausted or closed.
+        items: Number of items yielded by the stream.
+    """
+    name: str
+    first_item_s: float | None = None
+    total_s: float | None = None
+    items: int = 0
+
+    def __str__(self) -> str:
+        first = f"{self.first_item_s:.3f}s" if self.first_item_s is not None else "n/a"
+        total = f"{self.total_s:.3f}s" if self.total_s is not None else "n/a"
+        return f"[{self.name}] time-to-first-item={first} total={total} items={self.items}"
+
+
+async def timed_stream(stream: AsyncIterator[T], timing: StreamTiming) -> AsyncIterator[T]:
+    """
+    Pass items of a stream through while recording its time-to-first-item.
+
+    Args:
+        stream: The async iterator to measure. It should only yield useful items
+            (e.g. non-empty tokens), otherwise the first-item latency is meaningless.
+        timing: The StreamTiming object to fill in.
+
+    Yields:
+        The items of the wrapped stream, unchanged.
+    """
+    start = time.perf_counter()
+    try:
+        async for item in stream:
+            if timing.first_item_s is None:
+                timing.first_item_s = time.perf_counter() - start
+            timing.items += 1
+            yield item
+    finally:
+        timing.total_s = time.perf_counter() - start
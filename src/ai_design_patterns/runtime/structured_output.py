@@ -0,0 +1,446 @@
+"""
+Local repair of malformed structured output.
+
+Small models (the Ollama `granite4` / `qwen3` models, `nemotron-3-nano`) often return almost-valid
+structured output: JSON wrapped in code fences or preceded by `<think>` blocks, trailing commas,
+single quotes, "Laptop" for "Laptops", "Yes" for "yes", a score of "8/10" or a confidence of 85.
+`with_structured_output` turns all of these into an exception, and the only remedy is another
+full LLM round-trip.
+
+`repairing_structured_output` keeps the raw model response and, when parsing fails, repairs it
+locally before any retry:
+
+1. Tolerant JSON parsing: thinking tags and code fences are stripped, the first JSON object is
+   cut out of surrounding prose, trailing commas and Python literals are accepted and truncated
+   objects are closed.
+2. Coercion towards the schema: keys are matched ignoring case and underscores, enum and literal
+   values are normalized, numbers are parsed from strings, percentages and ratios are rescaled
+   to the field's bounds and small overshoots are clamped to them, and strings become lists
+   (split on commas only for fields marked `comma_separated`). Values that remain ambiguous
+   ("not positive", a confidence of 5 or 10, "1.299,00") are not guessed at and fail repair.
+
+The LLM is asked again only when repair fails. Outcomes are counted per schema (see `repair_stats`).
+"""
+
+import re
+import ast
+import json
+import types
+from enum import Enum
+from collections import defaultdict
+from typing import Annotated, Any, Dict, Literal, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic.fields import FieldInfo
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+_THINK_BLOCK = re.compile(r"<(think|thinking|reasoning)>.*?</\1>", re.S | re.I)
+_THINK_PREFIX = re.compile(r"^.*</(think|thinking|reasoning)>", re.S | re.I)
+_CODE_FENCE = re.compile(r"```[a-zA-Z]*\s*(.*?)```", re.S)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+# Any run of digits and separators, validated against _PLAIN_NUMBER so that "1.299,00" is not read as 1.299
+_NUMBER = re.compile(r"[-+]?(?:\d[\d.,]*\d|\d|\.\d+)(?:[eE][-+]?\d+)?")
+_PLAIN_NUMBER = re.compile(r"[-+]?(?:\d{1,3}(?:,\d{3})+|\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+# Share of a bounded field's range by which a number may overshoot a bound and still be clamped (1.02 -> 1.0)
+_CLAMP_TOLERANCE = 0.05
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+_YES = {"yes", "y", "true", "1", "continue"}
+_NO = {"no", "n", "false", "0", "stop", "done"}
+
+
+class RepairError(ValueError):
+    """Raised when a model response cannot be repaired into the requested schema."""
+
+
+def parse_json_lenient(text: str) -> Any:
+    """
+    Parse the JSON value embedded in a model response.
+
+    Args:
+        text: Raw model output.
+
+    Returns:
+        The parsed JSON value.
+
+    Raises:
+        RepairError: If no JSON value can be recovered.
+    """
+    text = _THINK_BLOCK.sub("", text)
+    # A closing tag without an opening one: the model's template swallowed the opening tag
+    text = _THINK_PREFIX.sub("", text)
+    if fence := _CODE_FENCE.search(text):
+        text = fence.group(1)
+    text = text.translate(_SMART_QUOTES).strip()
+
+    candidates = [text]
+    if (block := _json_block(text)) is not None and block != text:
+        candidates.append(block)
+
+    for candidate in candidates:
+        for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+            try:
+                # strict=False accepts raw newlines inside strings
+                return json.loads(attempt, strict=False)
+            except ValueError:
+                pass
+            try:
+                # Single-quoted strings and True/False/None
+                return ast.literal_eval(attempt)
+            except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+                pass
+
+    raise RepairError(f"No JSON value found in model output: {text[:200]!r}")
+
+
+def _json_block(text: str) -> str | None:
+    """Cut the first {...} or [...] block out of text, closing it if the output was truncated."""
+    start = min((i for i in (text.find("{"), text.find("[")) if i != -1), default=-1)
+    if start == -1:
+        return None
+
+    closers = []
+    quote = None
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not closers or closers.pop() != char:
+                return None
+            if not closers:
+                return text[start:i + 1]
+
+    # Truncated output: close the open string and brackets
+    return text[start:] + (quote or "") + "".join(reversed(closers))
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"[^a-z0-9]", "", str(value).lower())
+
+
+def _match_choice(value: Any, choices: Dict[str, Any]) -> Any:
+    """
+    Match value against normalized choices: exactly, then singular/plural.
+
+    There is no substring matching: it would turn "not positive" into "positive". Unmatched values
+    are returned unchanged and fail validation, so the model is asked again.
+    """
+    key = _normalize(value)
+    if key in choices:
+        return choices[key]
+    singular = {normalized.rstrip("s"): choice for normalized, choice in choices.items()}
+    if key.rstrip("s") in singular:
+        return singular[key.rstrip("s")]
+    return value
+
+
+def _coerce_literal(value: Any, options: tuple) -> Any:
+    if value in options:
+        return value
+    if {"yes", "no"} <= set(options):
+        key = _normalize(value)
+        if value is True or key in _YES:
+            return "yes"
+        if value is False or key in _NO:
+            return "no"
+    return _match_choice(value, {_normalize(option): option for option in options})
+
+
+def _coerce_enum(value: Any, enum: Type[Enum]) -> Any:
+    if isinstance(value, enum):
+        return value
+    choices = {}
+    for member in enum:
+        choices[_normalize(member.name)] = member.value
+        choices[_normalize(member.value)] = member.value
+    return _match_choice(value, choices)
+
+
+def _bounds(field: FieldInfo | None) -> tuple[float | None, float | None]:
+    lower = upper = None
+    for constraint in field.metadata if field else ():
+        lower = getattr(constraint, "ge", lower)
+        upper = getattr(constraint, "le", upper)
+    return lower, upper
+
+
+def _coerce_number(value: Any, annotation: type, field: FieldInfo | None) -> Any:
+    lower, upper = _bounds(field)
+
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return value
+    rescaled = False
+    if isinstance(value, str):
+        tokens = _NUMBER.findall(value)
+        if not tokens or not all(_PLAIN_NUMBER.fullmatch(token) for token in tokens):
+            # No number, or an ambiguous decimal separator ("1.299,00", "0,5")
+            return value
+        numbers = [float(token.replace(",", "")) for token in tokens]
+        number = numbers[0]
+        if "%" in value:
+            rescaled = True
+            number /= 100 if upper is not None and upper <= 1 else 1
+        elif "/" in value and len(numbers) >= 2 and numbers[1]:
+            # "8/10", or "4/5" rescaled to the field's upper bound
+            rescaled = True
+            number = number / numbers[1] * (upper if upper is not None else numbers[1])
+    else:
+        number = float(value)
+
+    # A 0..1 field given a bare percentage (85 -> 0.85). Only numbers above 10 are unambiguous: 10 or 5 may
+    # as well be a 0..10 score, so they are left out of range to fail validation and the model is asked again
+    if not rescaled and upper is not None and upper <= 1 and 10 < number <= 100:
+        number /= 100
+    if lower is not None and upper is not None:
+        # Clamp small overshoots only; anything further out of range fails validation
+        tolerance = _CLAMP_TOLERANCE * (upper - lower)
+        if lower - tolerance <= number < lower:
+            number = lower
+        elif upper < number <= upper + tolerance:
+            number = upper
+    return round(number) if annotation is int else number
+
+
+def _comma_separated(field: FieldInfo | None) -> bool:
+    extra = field.json_schema_extra if field else None
+    return isinstance(extra, dict) and bool(extra.get("comma_separated"))
+
+
+def _coerce_list(value: Any, item_type: Any, field: FieldInfo | None) -> Any:
+    if isinstance(value, str):
+        # Commas also occur inside items ("Search for the winner, then find their hometown"), so strings
+        # are only split on them for fields whose prompt asks for a comma-separated list
+        separators = r"[,\n;]" if _comma_separated(field) else r"\n"
+        value = [_LIST_MARKER.sub("", item).strip() for item in re.split(separators, value)]
+        value = [item for item in value if item]
+    elif not isinstance(value, list):
+        value = [value]
+    return [coerce_value(item, item_type) for item in value]
+
+
+def coerce_value(value: Any, annotation: Any, field: FieldInfo | None = None) -> Any:
+    """
+    Coerce a parsed JSON value towards a type annotation, leaving it unchanged where no rule applies.
+
+    Args:
+        value: The parsed value.
+        annotation: The target type annotation.
+        field: Pydantic field info, used for numeric bounds and list separators.
+
+    Returns:
+        The coerced value; pydantic validation decides whether it is acceptable.
+    """
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+
+    if origin is Annotated:
+        return coerce_value(value, args[0], field)
+    if origin in (Union, types.UnionType):
+        if value is None and type(None) in args:
+            return None
+        for option in (arg for arg in args if arg is not type(None)):
+            candidate = coerce_value(value, option, field)
+            try:
+                TypeAdapter(option).validate_python(candidate)
+                return candidate
+            except ValidationError:
+                continue
+        return value
+    if origin is Literal:
+        return _coerce_literal(value, args)
+    if origin is list:
+        return _coerce_list(value, args[0] if args else Any, field)
+    if isinstance(annotation, type):
+        if issubclass(annotation, Enum):
+            return _coerce_enum(value, annotation)
+        if issubclass(annotation, BaseModel):
+            return coerce_model(value, annotation)
+        if annotation in (int, float):
+            return _coerce_number(value, annotation, field)
+        if annotation is str:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return str(value)
+            if isinstance(value, list):
+                return ", ".join(str(item) for item in value)
+    return value
+
+
+def coerce_model(value: Any, schema: Type[BaseModel]) -> Any:
+    """
+    Coerce a parsed JSON object towards a pydantic model.
+
+    Keys are matched ignoring case and underscores (e.g. "continue" -> "continue_"). An object
+    that is missing the only field of a wrapper model (e.g. `Act.action`) is wrapped into it.
+
+    Args:
+        value: The parsed value.
+        schema: The target model.
+
+    Returns:
+        The coerced dictionary (or the value unchanged if it is not an object).
+    """
+    if not isinstance(value, dict):
+        return value
+
+    fields = schema.model_fields
+    names = {_normalize(name): name for name in fields}
+    names.update({_normalize(field.alias): name for name, field in fields.items() if field.alias})
+
+    data: Dict[str, Any] = {}
+    for key, item in value.items():
+        name = key if key in fields else names.get(_normalize(key), key)
+        if name not in data or key == name:
+            data[name] = item
+
+    if len(fields) == 1:
+        (name,) = fields
+        if name not in data:
+            data = {name: value}
+
+    for name, field in fields.items():
+        if name in data:
+            data[name] = coerce_value(data[name], field.annotation, field)
+    return data
+
+
+def _raw_payloads(raw: AIMessage) -> list[Any]:
+    """Candidate payloads of a raw model response, most structured first."""
+    payloads: list[Any] = [call["args"] for call in raw.tool_calls]
+    payloads += [call["args"] for call in raw.invalid_tool_calls if call.get("args")]
+    content = raw.content
+    if isinstance(content, list):
+        content = "".join(block if isinstance(block, str) else block.get("text", "") for block in content)
+    if content:
+        payloads.append(content)
+    return payloads
+
+
+def repair(raw: AIMessage | str, schema: Type[BaseModel]) -> BaseModel:
+    """
+    Repair a raw model response into an instance of `schema`.
+
+    Args:
+        raw: The raw model message (or its text).
+        schema: The target model.
+
+    Returns:
+        The validated model instance.
+
+    Raises:
+        RepairError: If no payload of the response can be repaired into the schema.
+    """
+    payloads = [raw] if isinstance(raw, str) else _raw_payloads(raw)
+    errors = []
+    for payload in payloads:
+        try:
+            data = parse_json_lenient(payload) if isinstance(payload, str) else payload
+            return schema.model_validate(coerce_model(data, schema))
+        except (RepairError, ValidationError) as exc:
+            errors.append(str(exc))
+    raise RepairError(f"Could not repair output into {schema.__name__}: {'; '.join(errors) or 'empty response'}")
+
+
+class RepairStats:
+    """
+    Per-schema counters of structured output outcomes.
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "parsed": 0, "repaired": 0, "repair_failed": 0, "retries": 0, "failed": 0}
+        )
+
+    def record(self, schema: str, outcome: str) -> None:
+        self._counters[schema][outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters per schema, with `repair_success_rate`: the share of malformed responses repaired locally.
+
+        Returns:
+            A JSON-serializable dictionary.
+        """
+        result = {}
+        for schema, counters in self._counters.items():
+            attempted = counters["repaired"] + counters["repair_failed"]
+            rate = counters["repaired"] / attempted if attempted else None
+            result[schema] = {**counters, "repair_success_rate": round(rate, 4) if rate is not None else None}
+        return result
+
+
+# Process-wide stats shared by all repairing structured outputs
+repair_stats = RepairStats()
+
+
+def repairing_structured_output(llm: BaseChatModel, schema: Type[BaseModel], max_retries: int = 1, **kwargs: Any) -> Runnable:
+    """
+    Drop-in replacement for `llm.with_structured_output(schema)` that repairs malformed output locally.
+
+    Args:
+        llm: The chat model.
+        schema: The pydantic model to produce.
+        max_retries: Number of LLM retries after a response that could not be repaired.
+        **kwargs: Forwarded to `with_structured_output` (e.g. `method`).
+
+    Returns:
+        A runnable returning `schema` instances.
+    """
+    structured = llm.with_structured_output(schema, include_raw=True, **kwargs)
+    name = schema.__name__
+
+    def outcome(result: Dict[str, Any]) -> BaseModel | None:
+        if result["parsing_error"] is None and result["parsed"] is not None:
+            repair_stats.record(name, "parsed")
+            return result["parsed"]
+        try:
+            repaired = repair(result["raw"], schema)
+        except RepairError:
+            repair_stats.record(name, "repair_failed")
+            return None
+        repair_stats.record(name, "repaired")
+        return repaired
+
+    def failed(result: Dict[str, Any]) -> OutputParserException:
+        repair_stats.record(name, "failed")
+        return OutputParserException(
+            f"Failed to parse {name} after {max_retries + 1} attempts: {result['parsing_error']}",
+            llm_output=str(result["raw"].content),
+        )
+
+    def invoke(input: Any, config: RunnableConfig) -> BaseModel:
+        repair_stats.record(name, "calls")
+        for attempt in range(max_retries + 1):
+            if attempt:
+                repair_stats.record(name, "retries")
+            result = structured.invoke(input, config)
+            if (parsed := outcome(result)) is not None:
+                return parsed
+        raise failed(result)
+
+    async def ainvoke(input: Any, config: RunnableConfig) -> BaseModel:
+        repair_stats.record(name, "calls")
+        for attempt in range(max_retries + 1):
+            if attempt:
+                repair_stats.record(name, "retries")
+            result = await structured.ainvoke(input, config)
+            if (parsed := outcome(result)) is not None:
+                return parsed
+        raise failed(result)
+
+    return RunnableLambda(invoke, afunc=ainvoke, name=f"{name}StructuredOutput")
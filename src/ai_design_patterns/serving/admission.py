@@ -0,0 +1,158 @@
+"""
+Admission control for the pattern-serving process.
+
+Every pattern gets its own `PatternGate`: a concurrency limit for running requests
+plus a bounded wait queue in front of it. Requests that find the queue full, or that
+wait longer than the queue timeout, are shed with `Overloaded` instead of piling up
+behind slow LLM calls.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict
+
+
+@dataclass(frozen=True)
+class PatternLimits:
+    """
+    Admission limits of a single pattern.
+
+    Attributes:
+        concurrency: Maximum number of requests running the pattern at the same time.
+        max_queue: Maximum number of requests waiting for a free slot; further requests are shed.
+        queue_timeout_s: Maximum time a request may wait for a free slot before it is shed.
+        request_timeout_s: Maximum time a running request may take.
+    """
+    concurrency: int = 4
+    max_queue: int = 16
+    queue_timeout_s: float = 30.0
+    request_timeout_s: float = 300.0
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request is shed instead of being admitted.
+
+    Attributes:
+        reason: Why the request was shed ("queue_full", "queue_timeout" or "draining").
+        retry_after_s: Suggested delay before the client retries.
+    """
+
+    def __init__(self, reason: str, retry_after_s: float):
+        super().__init__(f"Request shed: {reason}")
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class PatternGate:
+    """
+    Concurrency limit and bounded wait queue for a single pattern.
+
+    Args:
+        name: Name of the pattern, used in metrics.
+        limits: Admission limits of the pattern.
+        latency_window: Number of most recent request latencies kept for percentiles.
+    """
+
+    def __init__(self, name: str, limits: PatternLimits, latency_window: int = 512):
+        self.name = name
+        self.limits = limits
+        self.queued = 0
+        self.in_flight = 0
+        self.counters: Dict[str, int] = {
+            "accepted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "shed_queue_full": 0,
+            "shed_queue_timeout": 0,
+            "shed_draining": 0,
+        }
+        self._slots = asyncio.Semaphore(limits.concurrency)
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+
+    @property
+    def busy(self) -> bool:
+        """Whether the gate still has queued or running requests."""
+        return self.queued > 0 or self.in_flight > 0
+
+    def shed(self, reason: str) -> Overloaded:
+        """
+        Count a shed request and build the exception to raise for it.
+
+        Args:
+            reason: Why the request was shed.
+
+        Returns:
+            The Overloaded exception describing the shed request.
+        """
+        self.counters[f"shed_{reason}"] += 1
+        return Overloaded(reason, retry_after_s=max(1.0, self.limits.queue_timeout_s / 2))
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """
+        Wait for a free slot and hold it for the duration of the `async with` block.
+
+        Raises:
+            Overloaded: If the wait queue is full or the queue timeout expires.
+        """
+        if self._slots.locked() and self.queued >= self.limits.max_queue:
+            raise self.shed("queue_full")
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.limits.queue_timeout_s)
+        except TimeoutError:
+            raise self.shed("queue_timeout") from None
+        finally:
+            self.queued -= 1
+
+        self.counters["accepted"] += 1
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._latencies.append(time.perf_counter() - started)
+            self.in_flight -= 1
+            self._slots.release()
+
+    def record(self, outcome: str) -> None:
+        """
+        Count the outcome of an admitted request.
+
+        Args:
+            outcome: One of "completed", "failed" or "timed_out".
+        """
+        self.counters[outcome] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of the gate's limits, counters, queue depth and latency percentiles.
+
+        Returns:
+            A JSON-serializable dictionary.
+        """
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float | None:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4)
+
+        return {
+            "limits": {
+                "concurrency": self.limits.concurrency,
+                "max_queue": self.limits.max_queue,
+                "queue_timeout_s": self.limits.queue_timeout_s,
+                "request_timeout_s": self.limits.request_timeout_s,
+            },
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            **self.counters,
+            "latency_s": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99)},
+        }
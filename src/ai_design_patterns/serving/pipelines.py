@@ -0,0 +1,139 @@
+"""
+Pattern pipelines exposed by the serving process.
+
+Each pipeline pairs a request model with an async runner. Pattern modules create their
+LLM clients at import time, so runners import them lazily: a worker only pays for (and
+only needs credentials for) the patterns it actually serves.
+
+The parallel pattern reads PDFs from the server's disk and sends their text to a model, so
+request paths are confined to `PDF_DATA_DIR` (default: `./data`).
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Type
+
+from pydantic import BaseModel, Field
+
+from ai_design_patterns.parallel.pdf_extraction import PdfExtractionError
+from ai_design_patterns.serving.admission import PatternLimits
+
+DATA_DIR = Path(os.environ.get("PDF_DATA_DIR") or Path.cwd() / "data")
+
+
+class RoutingRequest(BaseModel):
+    query: str = Field(..., description="User query to classify and route.")
+
+
+class ParallelRequest(BaseModel):
+    file_path: str = Field(..., description="Path of the PDF file to process, relative to the server's PDF_DATA_DIR.")
+
+
+class ReflectionRequest(BaseModel):
+    idea: str = Field(..., description="Business idea to generate a pitch for.")
+    max_iters: int = Field(5, ge=1, le=10, description="Maximum number of refinement iterations.")
+
+
+class PromptChainingRequest(BaseModel):
+    text: str = Field(..., description="Product description to extract and enrich.")
+
+
+class PlanExecuteRequest(BaseModel):
+    input: str = Field(..., description="Objective to plan for and execute.")
+    recursion_limit: int = Field(50, ge=1, le=100, description="Maximum number of graph steps.")
+
+
+async def run_routing(request: RoutingRequest) -> Dict[str, Any]:
+    from ai_design_patterns.routing.LCEL_langchain_routing import routed_chain
+
+    message = await routed_chain.ainvoke(request.query)
+    return {"answer": message.content}
+
+
+def resolve_data_path(file_path: str, data_dir: Path = DATA_DIR) -> str:
+    """
+    Resolve a request's file path inside the data directory.
+
+    Args:
+        file_path: Path from the request, relative to `data_dir`.
+        data_dir: Directory requests may read from.
+
+    Returns:
+        The absolute path of the file.
+
+    Raises:
+        PdfExtractionError: If the path (after resolving "..", and symlinks) is outside `data_dir`.
+    """
+    root = data_dir.resolve()
+    resolved = (root / file_path).resolve()
+    if not resolved.is_relative_to(root):
+        raise PdfExtractionError(file_path, "input", "path is outside the server's data directory")
+    return str(resolved)
+
+
+async def run_parallel(request: ParallelRequest) -> Dict[str, Any]:
+    from ai_design_patterns.parallel.langchain_parallel import main
+
+    result = await main(resolve_data_path(request.file_path))
+    return result.model_dump(mode="json")
+
+
+async def run_reflection(request: ReflectionRequest) -> Dict[str, Any]:
+    from ai_design_patterns.reflection.langchain_reflection import astream_reflection_agent
+
+    best = None
+    async for event in astream_reflection_agent(request.idea, request.max_iters):
+        if event["event"] == "best":
+            best = event
+    return {"pitch": best["pitch"], "score": best["score"]}
+
+
+async def run_prompt_chaining(request: PromptChainingRequest) -> Dict[str, Any]:
+    from ai_design_patterns.prompt_chaining.langchain_prompt_chaining import full_chain
+
+    result = await full_chain.ainvoke({"text": request.text})
+    return result.model_dump(mode="json")
+
+
+_plan_execute_app = None
+
+
+async def run_plan_execute(request: PlanExecuteRequest) -> Dict[str, Any]:
+    global _plan_execute_app
+    if _plan_execute_app is None:
+        from ai_design_patterns.planning.plan_n_execute.main import build_app
+
+        _plan_execute_app = build_app()
+
+    state = await _plan_execute_app.ainvoke(
+        {"input": request.input},
+        config={"recursion_limit": request.recursion_limit},
+    )
+    return {"response": state.get("response"), "past_steps": [list(step) for step in state.get("past_steps", [])]}
+
+
+@dataclass(frozen=True)
+class Pipeline:
+    """
+    A pattern exposed over HTTP.
+
+    Attributes:
+        request_model: Pydantic model the JSON request body is validated against.
+        run: Coroutine function running the pattern and returning a JSON-serializable result.
+        limits: Default admission limits of the pattern.
+    """
+    request_model: Type[BaseModel]
+    run: Callable[[Any], Awaitable[Dict[str, Any]]]
+    limits: PatternLimits
+
+
+# Limits reflect how long a single request holds its slot: reflection and plan-and-execute
+# chain many LLM (and tool) calls, routing and prompt chaining only a couple.
+PIPELINES: Dict[str, Pipeline] = {
+    "routing": Pipeline(RoutingRequest, run_routing, PatternLimits(concurrency=16, max_queue=64, request_timeout_s=60.0)),
+    "parallel": Pipeline(ParallelRequest, run_parallel, PatternLimits(concurrency=4, max_queue=16, request_timeout_s=120.0)),
+    "reflection": Pipeline(ReflectionRequest, run_reflection, PatternLimits(concurrency=2, max_queue=8, request_timeout_s=600.0)),
+    "prompt_chaining": Pipeline(PromptChainingRequest, run_prompt_chaining, PatternLimits(concurrency=8, max_queue=32, request_timeout_s=60.0)),
+    "plan_execute": Pipeline(PlanExecuteRequest, run_plan_execute, PatternLimits(concurrency=2, max_queue=8, request_timeout_s=600.0)),
+}
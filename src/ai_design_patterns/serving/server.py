@@ -0,0 +1,475 @@
+"""
+Long-running HTTP service exposing the pattern pipelines.
+
+Each worker process runs its own asyncio event loop and binds the listening port with
+SO_REUSEPORT, so the kernel spreads connections across workers and every core is used.
+The parent process only supervises: it restarts crashed workers and forwards SIGTERM /
+SIGINT so that every worker drains gracefully.
+
+Since the kernel picks the worker answering each connection, workers publish their state:
+every second each one writes its metrics to `<state dir>/worker-<index>.json` in a directory
+created by the parent. /healthz and /metrics read all of these files, so whichever worker
+answers reports on the whole server.
+
+Endpoints:
+    POST /patterns/{name}   Run a pattern with a JSON request body (see `pipelines.PIPELINES`).
+    GET  /healthz           200 while every worker is serving; 503 if any worker is draining, or its state
+                            is missing or stale (crashed, restarting or hung). Lists the status of each worker.
+    GET  /metrics           Per-worker metrics (per-pattern admission counters, queue depth and latency
+                            percentiles, plus single-flight coalescing rates, per-role hedging stats and
+                            structured output repair rates of its model calls), and per-pattern totals.
+
+Run with `python main.py --port 8000 --workers 4`.
+"""
+
+import os
+import json
+import time
+import shutil
+import signal
+import asyncio
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from pydantic import ValidationError
+
+from ai_design_patterns.parallel.pdf_extraction import PdfExtractionError, pdf_extractor
+from ai_design_patterns.runtime.hedging import hedging_stats
+from ai_design_patterns.runtime.single_flight import default_flight
+from ai_design_patterns.runtime.structured_output import repair_stats
+from ai_design_patterns.serving.admission import Overloaded, PatternGate
+from ai_design_patterns.serving.pipelines import PIPELINES, Pipeline
+
+logger = logging.getLogger(__name__)
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+Response = Tuple[int, Dict[str, Any], Dict[str, str]]
+
+
+class HttpError(Exception):
+    """Raised while reading a request that cannot be served."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class PatternServer:
+    """
+    A single worker: HTTP/1.1 front end, per-pattern admission gates and graceful draining.
+
+    Args:
+        pipelines: Patterns to serve, keyed by URL name.
+        drain_timeout_s: How long to wait for queued and running requests when draining.
+        header_timeout_s: How long a client may take to send the request head and body.
+        max_body_bytes: Largest accepted request body.
+        state_dir: Directory the workers of one server publish their state to, or None for a single worker.
+        worker_index: Index of this worker among `workers`.
+        workers: Number of workers publishing to `state_dir`.
+        publish_interval_s: How often this worker publishes its state; state older than three intervals is stale.
+    """
+
+    def __init__(
+        self,
+        pipelines: Dict[str, Pipeline],
+        drain_timeout_s: float = 30.0,
+        header_timeout_s: float = 10.0,
+        max_body_bytes: int = 1 << 20,
+        state_dir: Path | None = None,
+        worker_index: int = 0,
+        workers: int = 1,
+        publish_interval_s: float = 1.0,
+    ):
+        self.pipelines = pipelines
+        self.gates = {name: PatternGate(name, pipeline.limits) for name, pipeline in pipelines.items()}
+        self.drain_timeout_s = drain_timeout_s
+        self.header_timeout_s = header_timeout_s
+        self.max_body_bytes = max_body_bytes
+        self.draining = False
+        self.started = time.monotonic()
+        self.state_dir = Path(state_dir) if state_dir is not None else None
+        self.worker_index = worker_index
+        self.workers = workers
+        self.publish_interval_s = publish_interval_s
+        self._server: asyncio.Server | None = None
+        self._publisher: asyncio.Task | None = None
+
+    async def start(self, host: str, port: int, reuse_port: bool) -> None:
+        self._server = await asyncio.start_server(self.handle_connection, host, port, reuse_port=reuse_port)
+        if self.state_dir is not None:
+            self._publisher = asyncio.create_task(self.publish_forever())
+        logger.info("Worker %d listening on %s:%d", os.getpid(), host, port)
+
+    async def publish_forever(self) -> None:
+        while True:
+            try:
+                await self.publish()
+            except Exception:
+                # Keep publishing: a worker that stops would be reported as stale until it is restarted
+                logger.exception("Worker %d could not publish its state", os.getpid())
+            await asyncio.sleep(self.publish_interval_s)
+
+    async def publish(self) -> None:
+        """Write this worker's metrics to its state file."""
+        # The snapshot is taken on the loop, since the counters it walks are only mutated there;
+        # only the file write runs on a thread
+        state = {**self.metrics(), "published_at": time.time()}
+        await asyncio.to_thread(self._write_state, state)
+
+    def _write_state(self, state: Dict[str, Any]) -> None:
+        path = self.state_dir / f"worker-{self.worker_index}.json"
+        # Write to a temporary file and rename, so readers never see a partial state
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.state_dir, suffix=".tmp", delete=False) as tmp:
+            json.dump(state, tmp)
+        os.replace(tmp.name, path)
+
+    async def drain(self) -> None:
+        """Stop accepting connections and wait for queued and running requests to finish."""
+        self.draining = True
+        if self._server is not None:
+            self._server.close()
+        if self._publisher is not None:
+            # Publish right away, so health checks stop routing here before the next interval
+            try:
+                await self.publish()
+            except Exception:
+                logger.exception("Worker %d could not publish its state", os.getpid())
+
+        deadline = time.monotonic() + self.drain_timeout_s
+        while any(gate.busy for gate in self.gates.values()) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+        abandoned = sum(gate.queued + gate.in_flight for gate in self.gates.values())
+        if abandoned:
+            logger.warning("Worker %d drain timed out with %d requests still open", os.getpid(), abandoned)
+        else:
+            logger.info("Worker %d drained", os.getpid())
+        if self._publisher is not None:
+            self._publisher.cancel()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, body = await asyncio.wait_for(self.read_request(reader), self.header_timeout_s)
+            except HttpError as exc:
+                status, payload, headers = exc.status, {"error": str(exc)}, {}
+            except (TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                return
+            else:
+                status, payload, headers = await self.dispatch(method, path, body)
+
+            data = json.dumps(payload).encode()
+            head = [
+                f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(data)}",
+                "Connection: close",
+                *(f"{key}: {value}" for key, value in headers.items()),
+            ]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        request_line = await reader.readline()
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line") from None
+
+        content_length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                try:
+                    content_length = int(value.strip())
+                except ValueError:
+                    raise HttpError(400, "Invalid Content-Length") from None
+
+        if content_length > self.max_body_bytes:
+            raise HttpError(413, f"Request body exceeds {self.max_body_bytes} bytes")
+        body = await reader.readexactly(content_length) if content_length else b""
+        return method.upper(), path.split("?", 1)[0], body
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Response:
+        if path == "/healthz":
+            if method != "GET":
+                return 405, {"error": "Use GET"}, {}
+            workers = await asyncio.to_thread(self.worker_states, self.metrics())
+            statuses = [
+                {key: state[key] for key in ("worker", "status", "pid", "age_s") if key in state} for state in workers
+            ]
+            healthy = all(state["status"] == "ok" for state in workers)
+            status = "ok" if healthy else "degraded"
+            if self.draining:
+                status = "draining"
+            return (200 if healthy else 503), {"status": status, "pid": os.getpid(), "workers": statuses}, {}
+
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": "Use GET"}, {}
+            workers = await asyncio.to_thread(self.worker_states, self.metrics())
+            return 200, {"pid": os.getpid(), "workers": workers, "totals": pattern_totals(workers)}, {}
+
+        prefix, _, name = path.rpartition("/")
+        if prefix != "/patterns" or name not in self.pipelines:
+            return 404, {"error": f"Unknown path {path}", "patterns": sorted(self.pipelines)}, {}
+        if method != "POST":
+            return 405, {"error": "Use POST"}, {}
+        return await self.run_pattern(name, body)
+
+    async def run_pattern(self, name: str, body: bytes) -> Response:
+        pipeline = self.pipelines[name]
+        gate = self.gates[name]
+
+        try:
+            request = pipeline.request_model.model_validate_json(body or b"{}")
+        except ValidationError as exc:
+            return 400, {"error": "Invalid request body", "details": json.loads(exc.json())}, {}
+
+        try:
+            if self.draining:
+                raise gate.shed("draining")
+            async with gate.admit():
+                try:
+                    result = await asyncio.wait_for(pipeline.run(request), gate.limits.request_timeout_s)
+                except TimeoutError:
+                    gate.record("timed_out")
+                    return 504, {"error": f"Pattern {name} timed out after {gate.limits.request_timeout_s}s"}, {}
+                except PdfExtractionError as exc:
+                    gate.record("failed")
+                    return 422, {"error": str(exc), "extraction": exc.to_dict()}, {}
+                except Exception as exc:
+                    gate.record("failed")
+                    logger.exception("Pattern %s failed", name)
+                    return 500, {"error": f"{type(exc).__name__}: {exc}"}, {}
+                gate.record("completed")
+                return 200, result, {}
+        except Overloaded as exc:
+            return 503, {"error": str(exc), "reason": exc.reason}, {"Retry-After": str(round(exc.retry_after_s))}
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.monotonic() - self.started, 3),
+            "draining": self.draining,
+            "patterns": {name: gate.metrics() for name, gate in self.gates.items()},
+            "single_flight": default_flight.stats(),
+            "hedging": hedging_stats(),
+            "structured_output": repair_stats.stats(),
+        }
+
+    def worker_states(self, local: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        State of every worker of the server: live for this worker, read from the state files for the others.
+
+        Each entry has the worker's index, a `status` ("ok", "draining", "stale" or "missing")
+        and, unless missing, the age of its state in seconds and its published metrics.
+
+        Args:
+            local: This worker's `metrics()`, taken on the event loop.
+
+        Returns:
+            One entry per worker, by index.
+        """
+        states = []
+        for index in range(self.workers):
+            if index == self.worker_index:
+                state = {**local, "age_s": 0.0}
+            else:
+                try:
+                    state = json.loads((self.state_dir / f"worker-{index}.json").read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    # Not published yet, or removed by the supervisor after a crash
+                    states.append({"worker": index, "status": "missing"})
+                    continue
+                state["age_s"] = round(max(0.0, time.time() - state.pop("published_at", 0.0)), 3)
+
+            if state["draining"]:
+                status = "draining"
+            elif state["age_s"] > 3 * self.publish_interval_s:
+                status = "stale"
+            else:
+                status = "ok"
+            states.append({"worker": index, "status": status, **state})
+        return states
+
+
+def pattern_totals(workers: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """
+    Sum the per-pattern queue depths and admission counters of several workers.
+
+    Latency percentiles cannot be summed and are only reported per worker.
+
+    Args:
+        workers: Worker states, as returned by `PatternServer.worker_states`.
+
+    Returns:
+        Summed integer metrics per pattern.
+    """
+    totals: Dict[str, Dict[str, int]] = {}
+    for state in workers:
+        for name, metrics in state.get("patterns", {}).items():
+            pattern = totals.setdefault(name, {})
+            for key, value in metrics.items():
+                if isinstance(value, int):
+                    pattern[key] = pattern.get(key, 0) + value
+    return totals
+
+
+async def serve_worker(
+    host: str,
+    port: int,
+    drain_timeout_s: float,
+    reuse_port: bool,
+    state_dir: Path | None = None,
+    worker_index: int = 0,
+    workers: int = 1,
+    pdf_workers: int | None = None,
+) -> None:
+    """
+    Serve until SIGTERM or SIGINT, then drain.
+
+    Args:
+        host: Interface to bind.
+        port: Port to bind.
+        drain_timeout_s: How long to wait for open requests when draining.
+        reuse_port: Whether to bind with SO_REUSEPORT so several workers can share the port.
+        state_dir: Directory the workers publish their state to, or None for a single worker.
+        worker_index: Index of this worker.
+        workers: Number of workers of the server.
+        pdf_workers: Size of this worker's PDF extraction process pool (defaults to the number of CPUs).
+    """
+    if pdf_workers is not None:
+        pdf_extractor.max_workers = pdf_workers
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = PatternServer(
+        PIPELINES, drain_timeout_s=drain_timeout_s, state_dir=state_dir, worker_index=worker_index, workers=workers
+    )
+    await server.start(host, port, reuse_port=reuse_port)
+    await stop.wait()
+    await server.drain()
+
+
+def run_worker(
+    host: str,
+    port: int,
+    drain_timeout_s: float,
+    reuse_port: bool,
+    state_dir: Path | None = None,
+    worker_index: int = 0,
+    workers: int = 1,
+    pdf_workers: int | None = None,
+) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    asyncio.run(serve_worker(host, port, drain_timeout_s, reuse_port, state_dir, worker_index, workers, pdf_workers))
+
+
+def serve(host: str, port: int, workers: int, drain_timeout_s: float, pdf_workers: int | None = None) -> None:
+    """
+    Start `workers` worker processes and supervise them until SIGTERM or SIGINT.
+
+    Crashed workers are restarted, and their state file is removed until the replacement
+    publishes its own. On shutdown every worker is asked to drain and given `drain_timeout_s`
+    (plus a small grace period) before it is killed.
+
+    Args:
+        host: Interface to bind.
+        port: Port to bind.
+        workers: Number of worker processes. With 1 worker the server runs in-process.
+        drain_timeout_s: How long each worker waits for open requests when draining.
+        pdf_workers: Size of each worker's PDF extraction process pool. Defaults to an even share
+            of the CPUs, so that all workers together start about one parse process per CPU.
+    """
+    if pdf_workers is None:
+        pdf_workers = max(1, (os.cpu_count() or 1) // max(1, workers))
+
+    if workers <= 1:
+        run_worker(host, port, drain_timeout_s, reuse_port=False, pdf_workers=pdf_workers)
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    ctx = multiprocessing.get_context("spawn")
+    state_dir = Path(tempfile.mkdtemp(prefix="ai-design-patterns-"))
+
+    def start_worker(index: int) -> multiprocessing.Process:
+        args = (host, port, drain_timeout_s, True, state_dir, index, workers, pdf_workers)
+        # Workers are not daemonic: they may start process pools of their own (see parallel.pdf_extraction)
+        process = ctx.Process(target=run_worker, args=args)
+        process.start()
+        return process
+
+    processes = [start_worker(index) for index in range(workers)]
+
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    while not stopping:
+        wait([process.sentinel for process in processes], timeout=1.0)
+        for i, process in enumerate(processes):
+            if not process.is_alive() and not stopping:
+                logger.warning("Worker %d exited with code %s, restarting", process.pid, process.exitcode)
+                (state_dir / f"worker-{i}.json").unlink(missing_ok=True)
+                processes[i] = start_worker(i)
+
+    logger.info("Draining %d workers", len(processes))
+    for process in processes:
+        if process.is_alive():
+            os.kill(process.pid, signal.SIGTERM)
+    deadline = time.monotonic() + drain_timeout_s + 5.0
+    for process in processes:
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.kill()
+    shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the AI design pattern pipelines over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="Seconds to wait for open requests on shutdown.")
+    parser.add_argument(
+        "--pdf-workers",
+        type=int,
+        default=None,
+        help="PDF extraction processes per worker (defaults to the number of CPUs divided by --workers).",
+    )
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.workers, args.drain_timeout, args.pdf_workers)
+
+
+if __name__ == "__main__":
+    main()
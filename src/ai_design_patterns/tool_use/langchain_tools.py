@@ -1,9 +1,11 @@
 import os
+import asyncio
 from dotenv import load_dotenv; load_dotenv()
 
 from langchain.agents import create_agent
 from langchain_openai.chat_models import ChatOpenAI
 
+from ai_design_patterns.runtime.hedging import hedge_config, hedged
 from ai_design_patterns.tool_use.tools import factorio, add_numbers, power_calc
 
 MODEL="nvidia/nemotron-3-nano-30b-a3b"
@@ -16,10 +18,26 @@ llm = ChatOpenAI(
     base_url=os.environ["OPENAI_BASE_URL"],
 ).bind_tools(all_tools, tool_choice="required")
 
-agent = create_agent(
-    model=llm,
-    tools=all_tools,
-    system_prompt="You are math assistant. Use tools for calculations",
+# Backup model for hedged runs: takes over runs that are slower than the primary's recent latency percentile
+llm_backup = ChatOpenAI(
+    model=hedge_config("tools").backup_model,
+    api_key=os.environ["OPENAI_KEY"],
+    base_url=os.environ["OPENAI_BASE_URL"],
+).bind_tools(all_tools, tool_choice="required")
+
+# The agent loop owns the model calls, so the whole run is hedged: tools here are pure functions and safe to repeat
+agent = hedged(
+    create_agent(
+        model=llm,
+        tools=all_tools,
+        system_prompt="You are math assistant. Use tools for calculations",
+    ),
+    create_agent(
+        model=llm_backup,
+        tools=all_tools,
+        system_prompt="You are math assistant. Use tools for calculations",
+    ),
+    role="tools",
 )
 
 queries = [
@@ -28,12 +46,19 @@ queries = [
     "Factorial of -1?",  # Error handling
     "How many moons does Mars have? Then factorial of that.",
 ]
-for q in queries:
-    print(f"Q: {q}")
-    result = agent.invoke({"messages": [("human", q)]})
-
-    last_msg = result['messages'][-1]
-    if hasattr(last_msg, 'tool_calls') and last_msg.tool_calls:
-        print("Tool called, but not executed.")
-    else:
-        print(f"A: {last_msg.content}")
+
+
+async def main():
+    for q in queries:
+        print(f"Q: {q}")
+        result = await agent.ainvoke({"messages": [("human", q)]})
+
+        last_msg = result['messages'][-1]
+        if hasattr(last_msg, 'tool_calls') and last_msg.tool_calls:
+            print("Tool called, but not executed.")
+        else:
+            print(f"A: {last_msg.content}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())